@@ -0,0 +1,107 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+from cpython.bytes cimport PyBytes_FromStringAndSize
+from libc.stdlib cimport free, malloc
+from libc.string cimport memchr, memcmp, memcpy
+
+# same rules as _TAG_RE in url.py: a tag opens with < or &lt; and runs to the
+# next > or &gt;, and a stray &gt; is dropped
+
+# states
+DEF TEXT = 0
+DEF TAG = 1
+
+# byte classes; & is resolved to one of the others by looking at the entity
+DEF OTHER = 0
+DEF OPEN = 1
+DEF CLOSE = 2
+DEF ENTITY_CLOSE = 3
+DEF AMP = 4
+
+# plain bytes in a row before the rest of the run is found with memchr
+DEF LONG_RUN = 16
+
+cdef unsigned char CLASS[256]
+cdef unsigned char NEXT[2][4]
+cdef unsigned char EMIT[2][4]
+
+for _b in range(256):
+    CLASS[_b] = OTHER
+CLASS[ord("<")] = OPEN
+CLASS[ord(">")] = CLOSE
+CLASS[ord("&")] = AMP
+
+NEXT[TEXT] = [TEXT, TAG, TEXT, TEXT]
+NEXT[TAG] = [TAG, TAG, TEXT, TEXT]
+EMIT[TEXT] = [1, 0, 1, 0]
+EMIT[TAG] = [0, 0, 0, 0]
+
+
+cdef inline Py_ssize_t _find(
+    const unsigned char* p, Py_ssize_t i, Py_ssize_t n, int c
+):
+    # index of the next c at or after i, or n when there is none
+    cdef const void* found = memchr(p + i, c, n - i)
+    if found == NULL:
+        return n
+    return <const unsigned char*>found - p
+
+
+cpdef bytes extract_text(const unsigned char[::1] buf):
+    cdef Py_ssize_t n = buf.shape[0]
+    cdef Py_ssize_t i = 0
+    cdef Py_ssize_t j = 0
+    cdef unsigned char state = TEXT
+    cdef unsigned char k
+    # next <, > and & at or after i; each is only searched for again once i
+    # has moved past it
+    cdef Py_ssize_t next_open = -1
+    cdef Py_ssize_t next_close = -1
+    cdef Py_ssize_t next_amp = -1
+    cdef Py_ssize_t stop
+    cdef Py_ssize_t run = 0
+    cdef const unsigned char* p
+    cdef char* out
+    if n == 0:
+        return b""
+    p = &buf[0]
+    out = <char*>malloc(n)
+    if out == NULL:
+        raise MemoryError()
+    try:
+        while i < n:
+            k = CLASS[p[i]]
+            if k == AMP:
+                k = OTHER
+                if i + 3 < n and memcmp(p + i, b"&lt;", 4) == 0:
+                    k = OPEN
+                    i += 3
+                elif i + 3 < n and memcmp(p + i, b"&gt;", 4) == 0:
+                    k = ENTITY_CLOSE
+                    i += 3
+            # always store the byte; only advance past it when it is text
+            out[j] = p[i]
+            j += EMIT[state][k]
+            state = NEXT[state][k]
+            i += 1
+            # count plain bytes in a row without a branch; once a run is long
+            # it is cheaper to search for its end than to keep stepping
+            run = (run + 1) * (k == OTHER)
+            if run < LONG_RUN or i == n:
+                continue
+            run = 0
+            if next_amp < i:
+                next_amp = _find(p, i, n, c"&")
+            if state == TEXT:
+                if next_open < i:
+                    next_open = _find(p, i, n, c"<")
+                stop = next_open if next_open < next_amp else next_amp
+                memcpy(out + j, p + i, stop - i)
+                j += stop - i
+            else:
+                if next_close < i:
+                    next_close = _find(p, i, n, c">")
+                stop = next_close if next_close < next_amp else next_amp
+            i = stop
+        return PyBytes_FromStringAndSize(out, j)
+    finally:
+        free(out)
@@ -0,0 +1,6 @@
+# builds the optional C version of the tag stripper used by url.py:
+#   python setup.py build_ext --inplace
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(ext_modules=cythonize("_url_fast.pyx"))
@@ -1,8 +1,49 @@
 from dataclasses import dataclass
+import asyncio
 import pytest
+import random
 import socket
 import ssl
-import os
+import threading
+import re
+import select
+import time
+import urllib.parse
+
+# a tag opens with < or &lt; and runs to the next > or &gt; (or the end of
+# the document); a stray &gt; outside a tag is dropped as well
+_TAG_RE = re.compile(rb"(?:<|&lt;).*?(?:>|&gt;|\Z)|&gt;", re.DOTALL)
+
+
+def _strip_tags(body: bytes) -> bytes:
+    return _TAG_RE.sub(b"", body)
+
+
+# C version of _strip_tags, built from _url_fast.pyx with setup.py
+try:
+    from _url_fast import extract_text
+except ImportError:
+    extract_text = _strip_tags
+
+# get_many keeps at most this many requests in flight on one connection, so
+# neither side blocks with a full socket buffer
+_PIPELINE_DEPTH = 16
+
+# loading the CA bundle is expensive, so every https connection shares one context
+_SSL_CTX = ssl.create_default_context()
+
+# resolved addresses, keyed by (host, port) => (expiry, getaddrinfo results)
+_DNS_CACHE: dict = {}
+_DNS_TTL = 60
+
+
+def _resolve(host, port):
+    now = time.monotonic()
+    cached = _DNS_CACHE.get((host, port))
+    if cached is None or cached[0] < now:
+        results = socket.getaddrinfo(host, port, socket.AF_INET, socket.SOCK_STREAM)
+        cached = _DNS_CACHE[(host, port)] = (now + _DNS_TTL, results)
+    return cached[1][0][4]
 
 
 @dataclass
@@ -10,34 +51,131 @@ class HTTPResponse:
     status_code: int
     status_text: str
     headers: dict
-    body: bytes
+    # a body received straight into a preallocated buffer is left as that
+    # bytearray rather than copied into bytes
+    body: bytes | bytearray
+
+
+class _SocketReader:
+    # reads straight from the socket; anything received past what the caller
+    # asked for stays in buf for the next read
+    def __init__(self, s):
+        self.s = s
+        self.buf = bytearray()
+        # set once recv reports the server closed the connection
+        self.eof = False
+        # total bytes received so far
+        self.received = 0
+
+    def _fill(self):
+        chunk = self.s.recv(65536)
+        self.buf += chunk
+        self.eof = not chunk
+        self.received += len(chunk)
+        return len(chunk)
+
+    def _read_until(self, marker: bytes, keep=False):
+        # the data up to marker, or None if the connection closed first
+        start = 0
+        while True:
+            end = self.buf.find(marker, start)
+            if end != -1:
+                with memoryview(self.buf) as view:
+                    data = bytes(view[: end + len(marker) if keep else end])
+                del self.buf[: end + len(marker)]
+                return data
+            # only rescan the tail that could hold a split marker
+            start = max(0, len(self.buf) - len(marker) + 1)
+            if not self._fill():
+                return None
+
+    def read_head(self):
+        head = self._read_until(b"\r\n\r\n")
+        if head is None:
+            # nothing at all, or a head cut off before its blank line
+            raise ConnectionError("Connection closed before end of headers")
+        return head
+
+    def readline(self):
+        line = self._read_until(b"\r\n", keep=True)
+        if line is None:
+            # like a file: whatever is left, then b"" at the end
+            line = bytes(self.buf)
+            self.buf.clear()
+        return line
+
+    def read_exactly(self, n):
+        if len(self.buf) >= n:
+            # already buffered (typically the whole body of a small response
+            # arrives with the head), so copy it out exactly once
+            with memoryview(self.buf) as view:
+                data = bytes(view[:n])
+            del self.buf[:n]
+            return data
+        # fill a buffer of the final size in place instead of growing one:
+        # what is buffered goes in first, the rest is received straight into
+        # it and the bytearray itself becomes the body
+        body = bytearray(n)
+        got = len(self.buf)
+        body[:got] = self.buf
+        self.buf.clear()
+        with memoryview(body) as view:
+            while got < n:
+                read = self.s.recv_into(view[got:])
+                self.eof = not read
+                self.received += read
+                if not read:
+                    raise ConnectionError("Connection closed before end of body")
+                got += read
+        return body
+
+    def read(self):
+        while self._fill():
+            pass
+        data = bytes(self.buf)
+        self.buf.clear()
+        return data
 
 
 class URL:
+    # idle keep-alive connections, keyed by (host, port, schema)
+    _pool: dict = {}
+
     def __init__(self, url: str):
         if url.startswith("data:"):
             self.schema = "data"
             self.path = url.split("data:")[1].split(",")
-        else:
-            self.schema = url.split("://")[0]
+            self.port = None
+            self.host = None
+            return
 
-        if self.schema not in ["http", "https", "file", "data"]:
+        parts = urllib.parse.urlsplit(url)
+        self.schema = parts.scheme
+        if self.schema not in ["http", "https", "file"]:
             raise ValueError("Schema must be http or https or file or data")
 
-        if self.schema == "data":
-            self.port = None
-            self.host = None
-        elif self.schema in ["http", "https", "file"]:
-            if not url.endswith("/"):
-                url += "/"
-            self.host = url.split("://")[1].split("/")[0]
-            if ":" in self.host:
-                self.port = self.host.split(":")[1]
-                self.host = self.host.split(":")[0]
-            else:
-                self.port = 80 if self.schema == "http" else 443
-            self.path = url.split("://")[1].split("/")[1:]
-            self.path = [p for p in self.path if p != ""]
+        self.host = parts.hostname
+        self.port = parts.port or (80 if self.schema == "http" else 443)
+        # Host header: host and any explicit port as written, minus userinfo
+        self._host_header = parts.netloc.rpartition("@")[2]
+        self.path = [p for p in parts.path.split("/") if p != ""]
+        # request target sent on the wire, query string included
+        self._raw_path = parts.path or "/"
+        if parts.query:
+            self._raw_path += "?" + parts.query
+        if self.schema in ["http", "https"]:
+            # the request never changes for a given URL, so encode it once
+            self._request = self.request_packet()
+
+    def checkout(self):
+        # an idle pooled connection to this origin, or None
+        s = URL._pool.pop((self.host, self.port, self.schema), None)
+        if s is not None:
+            # an idle connection only becomes readable once the server closes it
+            if not select.select([s], [], [], 0)[0]:
+                return s
+            s.close()
+        return None
 
     def connect(self):
         secure = True if self.schema == "https" else False
@@ -46,51 +184,230 @@ class URL:
             type=socket.SOCK_STREAM,
             proto=socket.IPPROTO_TCP,
         )
+        # send the small request packet right away instead of waiting on Nagle
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         if secure:
-            ctx = ssl.create_default_context()
-            s = ctx.wrap_socket(s, server_hostname=self.host)
-        s.connect((self.host, self.port))
+            s = _SSL_CTX.wrap_socket(s, server_hostname=self.host)
+        s.connect(_resolve(self.host, self.port))
+        if hasattr(socket, "TCP_QUICKACK"):
+            # Linux only: ack the response segments without delay
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
         return s
 
+    def release(self, s):
+        old = URL._pool.get((self.host, self.port, self.schema))
+        if old is not None:
+            old.close()
+        URL._pool[(self.host, self.port, self.schema)] = s
+
     def default_request_headers(self):
         return {
-            "Host": self.host,
-            "Connection": "close",
+            "Host": self._host_header,
+            "Connection": "keep-alive",
             "User-Agent": "Python HTTP Client",
         }
 
     def _get_encoding(self, headers: dict):
-        if "Content-Type".casefold() in headers:
-            content_type = headers["Content-Type".casefold()]
+        # response header names are stored lowercased
+        if "content-type" in headers:
+            content_type = headers["content-type"]
             if "charset=" in content_type:
                 return content_type.split("charset=")[1]
         return "utf-8"
 
-    def get_from_network(self):
-        s = self.connect()
+    def request_packet(self):
         packet = (
-            f"GET /{'/'.join(self.path)} HTTP/1.1\r\n"
+            f"GET {self._raw_path} HTTP/1.1\r\n"
             + "\r\n".join(
                 [f"{k}: {v}" for k, v in self.default_request_headers().items()]
             )
             + "\r\n\r\n"
         )
-        s.send(packet.encode("utf-8"))
-        response = s.makefile("rb", newline="\r\n")
-        status = response.readline().decode("utf-8")
+        return packet.encode("utf-8")
+
+    def get_from_network(self):
+        s = self.checkout()
+        if s is not None:
+            reader = _SocketReader(s)
+            try:
+                return self._exchange(reader)
+            except OSError:
+                # the server may drop an idle connection just as we reuse it;
+                # if nothing came back, ask again on a fresh one
+                if reader.received:
+                    raise
+        return self._exchange(_SocketReader(self.connect()))
+
+    def _exchange(self, reader):
+        s = reader.s
+        try:
+            s.sendall(self._request)
+            response, keep_alive = self._read_response(reader)
+        except BaseException:
+            s.close()
+            raise
+        if keep_alive:
+            self.release(s)
+        else:
+            s.close()
+        return response
+
+    @classmethod
+    def get_many(cls, urls: list):
+        responses = [None] * len(urls)
+        origins = {}
+        for i, url in enumerate(urls):
+            if url.schema in ["http", "https"]:
+                origins.setdefault((url.host, url.port, url.schema), []).append(i)
+            else:
+                responses[i] = url.get()
+        for pending in origins.values():
+            while pending:
+                first = urls[pending[0]]
+                s = first.checkout()
+                reused = s is not None
+                if not reused:
+                    s = first.connect()
+                reader = _SocketReader(s)
+                done = 0
+                sent = 0
+                keep_alive = True
+                try:
+                    while done < len(pending) and keep_alive:
+                        # pipelining: keep up to _PIPELINE_DEPTH requests in
+                        # flight, the responses come back in the same order
+                        batch = pending[sent : done + _PIPELINE_DEPTH]
+                        if batch:
+                            s.sendall(b"".join(urls[i]._request for i in batch))
+                            sent += len(batch)
+                        i = pending[done]
+                        responses[i], keep_alive = urls[i]._read_response(reader)
+                        done += 1
+                except OSError:
+                    s.close()
+                    # the server may close after any number of responses
+                    # without saying so; resend the rest on a new connection,
+                    # unless a fresh connection failed before answering at all
+                    if not (done or (reused and not reader.received)):
+                        raise
+                    pending = pending[done:]
+                    continue
+                except BaseException:
+                    s.close()
+                    raise
+                if keep_alive:
+                    first.release(s)
+                else:
+                    # the server stopped early, so resend the rest on a new
+                    # connection
+                    s.close()
+                pending = pending[done:]
+        return responses
+
+    def _read_response(self, response):
+        status_code, status_text, response_headers = self._parse_head(
+            response.read_head()
+        )
+        body = self._read_body(
+            response, self._body_reads(status_code, response_headers)
+        )
+        # a body that ran to EOF means the server has closed the connection
+        keep_alive = (
+            response_headers.get("connection", "").lower() != "close"
+            and not response.eof
+        )
+        return (
+            HTTPResponse(
+                status_code=int(status_code),
+                status_text=status_text,
+                headers=response_headers,
+                body=body,
+            ),
+            keep_alive,
+        )
+
+    def _parse_head(self, head: bytes):
+        status, *lines = head.decode("utf-8").split("\r\n")
         # 2 means split only 2 times
         # HTTP/1.1 200 OK => HTTP/1.1, 200, OK
         _, status_code, status_text = status.split(" ", 2)
-        status_text = status_text.rstrip("\r\n")
         response_headers = {}
-        while True:
-            line = response.readline().decode("utf-8")
-            if line == "\r\n":
-                break
+        for line in lines:
             header, value = line.split(":", 1)
-            response_headers[header.casefold()] = value.strip()
-        body = response.read()
-        s.close()
+            response_headers[header.lower()] = value.strip()
+        return status_code, status_text, response_headers
+
+    def _body_reads(self, status_code: str, headers: dict):
+        # the framing rules for a response body, free of I/O so the blocking
+        # and asyncio readers share them; yields b"\r\n" to ask for a line, n
+        # for exactly n bytes or None for everything up to EOF, gets the data
+        # sent back, and returns the body
+        if status_code.startswith("1") or status_code in ("204", "304"):
+            return b""
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                # chunk size in hex, optionally followed by ;extensions
+                line = yield b"\r\n"
+                if not line:
+                    raise ConnectionError("Connection closed before end of body")
+                size = int(line.split(b";")[0], 16)
+                if size == 0:
+                    break
+                body += yield size
+                yield b"\r\n"
+            # skip any trailers up to the closing blank line
+            while (yield b"\r\n") not in (b"\r\n", b""):
+                pass
+            return bytes(body)
+        if "content-length" in headers:
+            return (yield int(headers["content-length"]))
+        # without a length the body only ends when the server closes
+        return (yield None)
+
+    def _read_body(self, response, reads):
+        try:
+            want = next(reads)
+            while True:
+                if want is None:
+                    data = response.read()
+                elif want == b"\r\n":
+                    data = response.readline()
+                else:
+                    data = response.read_exactly(want)
+                want = reads.send(data)
+        except StopIteration as done:
+            return done.value
+
+    async def get_async(self):
+        if self.schema not in ["http", "https"]:
+            return self.get()
+        reader, writer = await asyncio.open_connection(
+            self.host,
+            self.port,
+            ssl=_SSL_CTX if self.schema == "https" else None,
+        )
+        try:
+            writer.write(self._request)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            status_code, status_text, response_headers = self._parse_head(head[:-4])
+            reads = self._body_reads(status_code, response_headers)
+            try:
+                want = next(reads)
+                while True:
+                    if want is None:
+                        data = await reader.read()
+                    elif want == b"\r\n":
+                        data = await reader.readline()
+                    else:
+                        data = await reader.readexactly(want)
+                    want = reads.send(data)
+            except StopIteration as done:
+                body = done.value
+        finally:
+            writer.close()
+            await writer.wait_closed()
         return HTTPResponse(
             status_code=int(status_code),
             status_text=status_text,
@@ -100,19 +417,15 @@ class URL:
 
     def get_from_file(self):
         path = "/".join(self.path)
-        if not os.path.exists(path):
-            raise FileNotFoundError("No such file or directory: " + path)
-        if os.path.isdir(path):
-            raise IsADirectoryError("Is a directory: " + path)
-        if not os.access(path, os.R_OK):
-            raise PermissionError("Permission denied: " + path)
-        with open(path, "r") as f:
+        # open() raises FileNotFoundError, IsADirectoryError or PermissionError
+        # itself; unbuffered, read() sizes its buffer from a single fstat
+        with open(path, "rb", buffering=0) as f:
             body = f.read()
         return HTTPResponse(
             status_code=200,
             status_text="OK",
             headers={},
-            body=body.encode("utf-8"),
+            body=body,
         )
 
     def get_from_data(self):
@@ -131,25 +444,19 @@ class URL:
         elif self.schema in ["http", "https"]:
             return self.get_from_network()
 
-    def extract_text_from_html(self, html: str):
-        in_tag = False
-        text = ""
-        while html:
-            if html.startswith("<") or html.startswith("&lt;"):
-                in_tag = True
-            elif html.startswith(">") or html.startswith("&gt;"):
-                in_tag = False
-            elif not in_tag:
-                text += html[0]
-            html = html[1:]
-        return text
+    def extract_text_from_html(self, html: bytes):
+        if not html:
+            return b""
+        return extract_text(html)
 
     def show_text(self):
         response = self.get()
         encoding = self._get_encoding(response.headers)
-        body = response.body
-        html = body.decode(encoding)
-        print(self.extract_text_from_html(html))
+        if self.schema == "data" and "text/html" not in self.path[0]:
+            # a non-html data: URL has no tags to strip
+            print(response.body.decode(encoding, "replace"))
+            return
+        print(self.extract_text_from_html(response.body).decode(encoding, "replace"))
 
 
 class TestURL:
@@ -186,8 +493,15 @@ class TestURL:
         url = URL("https://example.com:8080/")
         assert url.schema == "https"
         assert url.host == "example.com"
+        assert url.port == 8080
         assert url.path == []
 
+    def test_host_header_keeps_port(self):
+        url = URL("http://127.0.0.1:8080/x")
+        assert b"\r\nHost: 127.0.0.1:8080\r\n" in url._request
+        url = URL("http://user@example.com/")
+        assert b"\r\nHost: example.com\r\n" in url._request
+
     def test_url_with_port_and_path(self):
         url = URL("https://example.com:8080/path/to/file")
         assert url.schema == "https"
@@ -195,6 +509,334 @@ class TestURL:
         assert url.path == ["path", "to", "file"]
 
 
+class TestExtractText:
+    def test_strips_tags(self):
+        url = URL("data:text/html,<h1>Example Domain</h1>")
+        assert url.extract_text_from_html(b"<h1>Example <b>Domain</b></h1>") == (
+            b"Example Domain"
+        )
+
+    def test_strips_escaped_tags(self):
+        url = URL("data:text/html,")
+        assert url.extract_text_from_html(b"a&lt;b&gt;c") == b"ac"
+        assert url.extract_text_from_html(b"a&lt;b>c<d&gt;e") == b"ace"
+        assert url.extract_text_from_html(b"a&gt;b") == b"ab"
+
+    def test_unclosed_tag(self):
+        url = URL("data:text/html,")
+        assert url.extract_text_from_html(b"text<p") == b"text"
+
+    def test_empty(self):
+        url = URL("data:text/html,")
+        assert url.extract_text_from_html(b"") == b""
+
+    def test_show_text_plain_data(self, capsys):
+        URL("data:text/plain,<b>hi</b>").show_text()
+        assert capsys.readouterr().out == "<b>hi</b>\n"
+
+    def test_show_text_decodes_once(self, capsys):
+        URL("data:text/html,<p>caf\u00e9</p>&lt;b&gt;").show_text()
+        assert capsys.readouterr().out == "caf\u00e9\n"
+
+
+class TestExtractTextFast:
+    def test_matches_regex(self):
+        fast = pytest.importorskip("_url_fast")
+        pieces = [b"<", b">", b"&", b"lt;", b"gt;", b"&lt;", b"&gt;", b"a", b" "]
+        # long enough runs to take the memchr path
+        pieces.append(b"a" * 20)
+        pieces.append("\u00e9\u4e2d".encode("utf-8"))
+        rng = random.Random(0)
+        for _ in range(5000):
+            html = b"".join(rng.choices(pieces, k=rng.randint(0, 30)))
+            assert fast.extract_text(html) == _strip_tags(html)
+
+
+class TestChunked:
+    def test_read_chunked(self):
+        url = URL("http://example.com/")
+        response = _reader(b"5\r\nHello\r\n7;ext=1\r\n, World\r\n0\r\n\r\n")
+        reads = url._body_reads("200", {"transfer-encoding": "chunked"})
+        assert url._read_body(response, reads) == b"Hello, World"
+        assert response.read() == b""
+
+    def test_closed_before_last_chunk(self):
+        url = URL("http://example.com/")
+        reads = url._body_reads("200", {"transfer-encoding": "chunked"})
+        with pytest.raises(ConnectionError):
+            url._read_body(_reader(b"5\r\nHello\r\n"), reads)
+
+
+class TestAsync:
+    def test_get_async_data(self):
+        url = URL("data:text/html,<h1>Example Domain</h1>")
+        response = asyncio.run(url.get_async())
+        assert response.body == b"<h1>Example Domain</h1>"
+
+    def test_get_async_network(self):
+        async def handle(reader, writer):
+            request = await reader.readuntil(b"\r\n\r\n")
+            if request.startswith(b"GET /chunked "):
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                    b"5\r\nHello\r\n0\r\nX-Trailer: 1\r\n\r\n"
+                )
+            elif request.startswith(b"GET /eof "):
+                writer.write(b"HTTP/1.1 200 OK\r\nConnection: close\r\n\r\nBye")
+                writer.write_eof()
+            else:
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nWorld")
+            await writer.drain()
+            writer.close()
+
+        async def main():
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                return await asyncio.gather(
+                    *(
+                        URL(f"http://127.0.0.1:{port}{path}").get_async()
+                        for path in ["/chunked", "/", "/eof"]
+                    )
+                )
+
+        chunked, plain, eof = asyncio.run(main())
+        assert chunked.body == b"Hello"
+        assert (plain.status_code, plain.body) == (200, b"World")
+        assert eof.body == b"Bye"
+
+
+class TestResolve:
+    def test_resolve_is_cached(self):
+        assert _resolve("127.0.0.1", 80) == ("127.0.0.1", 80)
+        assert ("127.0.0.1", 80) in _DNS_CACHE
+
+
+def _reader(data: bytes):
+    # a _SocketReader over a connection that sends data and then closes
+    a, b = socket.socketpair()
+    a.sendall(data)
+    a.close()
+    return _SocketReader(b)
+
+
+class TestReadHead:
+    def test_truncated_head(self):
+        with pytest.raises(ConnectionError):
+            _reader(b"HTTP/1.1 200 OK\r\nContent-Le").read_head()
+
+    def test_nothing_received(self):
+        with pytest.raises(ConnectionError):
+            _reader(b"").read_head()
+
+
+class TestReadExactly:
+    def test_buffered(self):
+        reader = _reader(b"HTTP/1.1 200 OK\r\n\r\nHello, World")
+        reader.read_head()
+        body = reader.read_exactly(5)
+        assert body == b"Hello"
+        assert type(body) is bytes
+        assert reader.buf == b", World"
+
+    def test_received(self):
+        reader = _reader(b"Hello, World")
+        body = reader.read_exactly(12)
+        assert body == b"Hello, World"
+        assert type(body) is bytearray
+
+    def test_short(self):
+        with pytest.raises(ConnectionError):
+            _reader(b"Hi").read_exactly(5)
+
+
+class TestParseHead:
+    def test_parse_head(self):
+        url = URL("http://example.com/")
+        head = (
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type:text/html; charset=UTF-8\r\n"
+            b"Content-Length: 5 \r\n"
+            b"X-Empty:"
+        )
+        assert url._parse_head(head) == (
+            "200",
+            "OK",
+            {
+                "content-type": "text/html; charset=UTF-8",
+                "content-length": "5",
+                "x-empty": "",
+            },
+        )
+
+    def test_malformed_header(self):
+        url = URL("http://example.com/")
+        with pytest.raises(ValueError):
+            url._parse_head(b"HTTP/1.1 200 OK\r\nno colon here")
+
+
+class TestSocketReader:
+    def test_head_and_body(self):
+        a, b = socket.socketpair()
+        a.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nHello")
+        a.close()
+        reader = _SocketReader(b)
+        assert reader.read_head() == b"HTTP/1.1 200 OK\r\nContent-Length: 5"
+        assert reader.read_exactly(5) == b"Hello"
+        assert reader.read() == b""
+        b.close()
+
+    def test_pipelined_responses(self):
+        a, b = socket.socketpair()
+        a.sendall(
+            b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nHello"
+            b"HTTP/1.1 404 Not Found\r\nConnection: close\r\n\r\nGone"
+        )
+        a.close()
+        reader = _SocketReader(b)
+        url = URL("http://example.com/")
+        response, keep_alive = url._read_response(reader)
+        assert (response.status_code, response.body, keep_alive) == (
+            200,
+            b"Hello",
+            True,
+        )
+        response, keep_alive = url._read_response(reader)
+        assert (response.status_text, response.body, keep_alive) == (
+            "Not Found",
+            b"Gone",
+            False,
+        )
+        b.close()
+
+
+class TestFile:
+    def test_get_file(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "index.html").write_bytes(b"<h1>Example Domain</h1>")
+        assert URL("file://./index.html").get().body == b"<h1>Example Domain</h1>"
+
+    def test_missing_file(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(FileNotFoundError):
+            URL("file://./missing.html").get()
+
+    def test_directory(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "dir").mkdir()
+        with pytest.raises(IsADirectoryError):
+            URL("file://./dir").get()
+
+
+class _LocalServer:
+    # a small keep-alive HTTP server on 127.0.0.1 that answers every GET with
+    # its own path; after max_requests responses on one connection it closes
+    # that connection without warning when the next request arrives
+    def __init__(self, max_requests=None):
+        self.max_requests = max_requests
+        self.connections = 0
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        buf = b""
+        served = 0
+        with conn:
+            while True:
+                while b"\r\n\r\n" not in buf:
+                    chunk = conn.recv(65536)
+                    if not chunk:
+                        return
+                    buf += chunk
+                request, buf = buf.split(b"\r\n\r\n", 1)
+                if served == self.max_requests:
+                    # close cleanly, draining whatever the client still sends
+                    conn.shutdown(socket.SHUT_WR)
+                    while conn.recv(65536):
+                        pass
+                    return
+                path = request.split(b" ")[1]
+                conn.sendall(
+                    b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%b"
+                    % (len(path), path)
+                )
+                served += 1
+
+    def close(self):
+        self.listener.close()
+
+
+class TestPool:
+    def test_reuses_connection(self):
+        server = _LocalServer()
+        try:
+            url = URL(f"http://127.0.0.1:{server.port}/a")
+            assert url.get().body == b"/a"
+            assert ("127.0.0.1", server.port, "http") in URL._pool
+            assert URL(f"http://127.0.0.1:{server.port}/b").get().body == b"/b"
+            assert server.connections == 1
+        finally:
+            server.close()
+
+    def test_retries_dropped_connection(self):
+        server = _LocalServer(max_requests=1)
+        try:
+            assert URL(f"http://127.0.0.1:{server.port}/a").get().body == b"/a"
+            assert URL(f"http://127.0.0.1:{server.port}/b").get().body == b"/b"
+            assert server.connections == 2
+        finally:
+            server.close()
+
+    def test_fresh_connection_failure_is_not_retried(self):
+        server = _LocalServer(max_requests=0)
+        try:
+            with pytest.raises(ConnectionError):
+                URL(f"http://127.0.0.1:{server.port}/a").get()
+            assert server.connections == 1
+        finally:
+            server.close()
+
+
+class TestGetMany:
+    def test_order_origins_and_resend(self):
+        limited = _LocalServer(max_requests=3)
+        open_ended = _LocalServer()
+        try:
+            urls = [
+                URL(f"http://127.0.0.1:{server.port}/{n}")
+                for n, server in enumerate([limited, open_ended] * 20)
+            ]
+            urls.insert(5, URL("data:text/html,<b>x</b>"))
+            responses = URL.get_many(urls)
+            expected = [b"/%d" % n for n in range(40)]
+            expected.insert(5, b"<b>x</b>")
+            assert [response.body for response in responses] == expected
+            assert open_ended.connections == 1
+            # 20 requests at 3 per connection
+            assert limited.connections == 7
+        finally:
+            limited.close()
+            open_ended.close()
+
+    def test_fresh_connection_failure_raises(self):
+        server = _LocalServer(max_requests=0)
+        try:
+            with pytest.raises(ConnectionError):
+                URL.get_many([URL(f"http://127.0.0.1:{server.port}/a")])
+        finally:
+            server.close()
+
+
 class TestRequest:
     def test_get(self):
         url = URL("http://example.com/")